@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import stat
+import tempfile
+import threading
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -15,6 +20,20 @@ if TYPE_CHECKING:
     from nanobot.session.manager import Session
 
 
+# Every session's MemoryStore shares the workspace memory files, and consolidations of
+# different sessions may write them from worker threads at the same time.
+_FILE_LOCKS: dict[Path, threading.Lock] = {}
+
+
+def _file_lock(path: Path) -> threading.Lock:
+    return _FILE_LOCKS.setdefault(path.resolve(), threading.Lock())
+
+
+# Process umask, read once at import (os.umask can only be queried by setting it).
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
 _SAVE_MEMORY_TOOL = [
     {
         "type": "function",
@@ -41,6 +60,29 @@ _SAVE_MEMORY_TOOL = [
     }
 ]
 
+_CONSOLIDATION_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a memory consolidation agent. Call the save_memory tool with your consolidation of the conversation.",
+}
+
+_CONSOLIDATION_PROMPT = """Process this conversation and call the save_memory tool with your consolidation.
+
+## Current Long-term Memory
+{current_memory}
+
+## Conversation to Process
+{conversation}"""
+
+
+def _format_message(m: dict) -> str | None:
+    """Render one session message as a transcript line, or None if it has no content."""
+    content = m.get("content")
+    if not content:
+        return None
+    tools = m.get("tools_used")
+    tools_str = f" [tools: {', '.join(tools)}]" if tools else ""
+    return f"[{(m.get('timestamp') or '?')[:16]}] {m['role'].upper()}{tools_str}: {content}"
+
 
 class MemoryStore:
     """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (grep-searchable log)."""
@@ -49,17 +91,49 @@ class MemoryStore:
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
         self.history_file = self.memory_dir / "HISTORY.md"
+        self._memory_lock = _file_lock(self.memory_file)
+        self._history_lock = _file_lock(self.history_file)
+        self._mem_cache: tuple[tuple[int, int, int], str] | None = None  # ((ino, mtime_ns, size), content)
 
     def read_long_term(self) -> str:
-        if self.memory_file.exists():
-            return self.memory_file.read_text(encoding="utf-8")
-        return ""
+        try:
+            st = self.memory_file.stat()
+        except FileNotFoundError:
+            self._mem_cache = None
+            return ""
+        # os.replace always swaps in a new inode, so atomic writes invalidate the cache
+        # even when size and mtime happen to match.
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if self._mem_cache and self._mem_cache[0] == key:
+            return self._mem_cache[1]
+        content = self.memory_file.read_text(encoding="utf-8")
+        self._mem_cache = (key, content)
+        return content
 
     def write_long_term(self, content: str) -> None:
-        self.memory_file.write_text(content, encoding="utf-8")
+        # Write to a uniquely named sibling temp file and rename so a crash never leaves
+        # MEMORY.md half-written and concurrent writers never share a temp file. A symlinked
+        # MEMORY.md is written through to its target, and the file keeps its permissions
+        # (mkstemp would otherwise leave it 0600).
+        target = self.memory_file.resolve()
+        with self._memory_lock:
+            try:
+                mode = stat.S_IMODE(target.stat().st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f"{target.name}.", suffix=".tmp")
+            try:
+                with open(fd, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.chmod(tmp, mode)
+                os.replace(tmp, target)
+            finally:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+        self._mem_cache = None
 
     def append_history(self, entry: str) -> None:
-        with open(self.history_file, "a", encoding="utf-8") as f:
+        with self._history_lock, open(self.history_file, "a", encoding="utf-8") as f:
             f.write(entry.rstrip() + "\n\n")
 
     def get_memory_context(self) -> str:
@@ -79,41 +153,37 @@ class MemoryStore:
 
         Returns True on success (including no-op), False on failure.
         """
+        messages = session.messages
+        # Index window over the messages to consolidate; slicing a range is O(1) and
+        # keeps list-slice semantics without copying the session history.
         if archive_all:
-            old_messages = session.messages
+            window = range(len(messages))
             keep_count = 0
-            logger.info("Memory consolidation (archive_all): {} messages", len(session.messages))
+            logger.info("Memory consolidation (archive_all): {} messages", len(messages))
         else:
             keep_count = memory_window // 2
-            if len(session.messages) <= keep_count:
+            if len(messages) <= keep_count:
                 return True
-            if len(session.messages) - session.last_consolidated <= 0:
+            if len(messages) - session.last_consolidated <= 0:
                 return True
-            old_messages = session.messages[session.last_consolidated:-keep_count]
-            if not old_messages:
+            window = range(len(messages))[session.last_consolidated:-keep_count]
+            if not window:
                 return True
-            logger.info("Memory consolidation: {} to consolidate, {} keep", len(old_messages), keep_count)
+            logger.info("Memory consolidation: {} to consolidate, {} keep", len(window), keep_count)
 
-        lines = []
-        for m in old_messages:
-            if not m.get("content"):
-                continue
-            tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
-            lines.append(f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {m['content']}")
+        lines = (_format_message(messages[i]) for i in window)
+        conversation = "\n".join(line for line in lines if line)
 
-        current_memory = self.read_long_term()
-        prompt = f"""Process this conversation and call the save_memory tool with your consolidation.
-
-## Current Long-term Memory
-{current_memory or "(empty)"}
-
-## Conversation to Process
-{chr(10).join(lines)}"""
+        current_memory = await asyncio.to_thread(self.read_long_term)
+        prompt = _CONSOLIDATION_PROMPT.format_map({
+            "current_memory": current_memory or "(empty)",
+            "conversation": conversation,
+        })
 
         try:
             response = await provider.chat(
                 messages=[
-                    {"role": "system", "content": "You are a memory consolidation agent. Call the save_memory tool with your consolidation of the conversation."},
+                    _CONSOLIDATION_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt},
                 ],
                 tools=_SAVE_MEMORY_TOOL,
@@ -139,15 +209,18 @@ class MemoryStore:
                 logger.warning("Memory consolidation: unexpected arguments type {}", type(args).__name__)
                 return False
 
+            # HISTORY.md and MEMORY.md are independent files, so write them concurrently.
+            writes = []
             if entry := args.get("history_entry"):
                 if not isinstance(entry, str):
                     entry = json.dumps(entry, ensure_ascii=False)
-                self.append_history(entry)
+                writes.append(asyncio.to_thread(self.append_history, entry))
             if update := args.get("memory_update"):
                 if not isinstance(update, str):
                     update = json.dumps(update, ensure_ascii=False)
                 if update != current_memory:
-                    self.write_long_term(update)
+                    writes.append(asyncio.to_thread(self.write_long_term, update))
+            await asyncio.gather(*writes)
 
             session.last_consolidated = 0 if archive_all else len(session.messages) - keep_count
             logger.info("Memory consolidation done: {} messages, last_consolidated={}", len(session.messages), session.last_consolidated)
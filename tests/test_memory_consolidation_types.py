@@ -5,6 +5,7 @@ When memory consolidation receives dict values instead of strings from the LLM
 tool call response, it should serialize them to JSON instead of raising TypeError.
 """
 
+import asyncio
 import json
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
@@ -220,3 +221,72 @@ class TestMemoryConsolidationTypeHandling:
         result = await store.consolidate(session, provider, "test-model", memory_window=50)
 
         assert result is False
+
+    @pytest.mark.asyncio
+    async def test_prompt_formats_conversation_lines(self, tmp_path: Path) -> None:
+        """Messages are rendered one per line; empty ones skipped, tools and missing timestamps handled."""
+        store = MemoryStore(tmp_path)
+        provider = AsyncMock()
+        provider.chat = AsyncMock(return_value=LLMResponse(content="no tool", tool_calls=[]))
+        session = _make_session(message_count=0)
+        session.messages = [
+            {"role": "user", "content": "hello", "timestamp": "2026-01-01T10:00:00.123"},
+            {"role": "assistant", "content": "", "timestamp": "2026-01-01T10:00:01"},
+            {"role": "assistant", "content": "done", "tools_used": ["read_file", "exec"]},
+            {"role": "user", "content": "bye", "timestamp": None},
+        ]
+
+        await store.consolidate(session, provider, "test-model", archive_all=True)
+
+        prompt = provider.chat.call_args.kwargs["messages"][1]["content"]
+        assert prompt.endswith(
+            "## Conversation to Process\n"
+            "[2026-01-01T10:00] USER: hello\n"
+            "[?] ASSISTANT [tools: read_file, exec]: done\n"
+            "[?] USER: bye"
+        )
+
+    @pytest.mark.asyncio
+    async def test_prompt_includes_only_unconsolidated_window(self, tmp_path: Path) -> None:
+        """Only messages between last_consolidated and the kept tail reach the prompt."""
+        store = MemoryStore(tmp_path)
+        provider = AsyncMock()
+        provider.chat = AsyncMock(return_value=LLMResponse(content="no tool", tool_calls=[]))
+        session = _make_session(message_count=60)
+        session.last_consolidated = 10
+
+        await store.consolidate(session, provider, "test-model", memory_window=50)
+
+        prompt = provider.chat.call_args.kwargs["messages"][1]["content"]
+        contents = [line.rsplit(": ", 1)[1] for line in prompt.split("## Conversation to Process\n")[1].splitlines()]
+        assert contents == [f"msg{i}" for i in range(10, 35)]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_consolidations_share_workspace(self, tmp_path: Path) -> None:
+        """Two sessions consolidating into one workspace at once both succeed cleanly."""
+        updates = [f"# Memory\nFact from chat {i}." + "x" * 4096 for i in range(2)]
+
+        async def _consolidate(i: int) -> bool:
+            provider = AsyncMock()
+            provider.chat = AsyncMock(
+                return_value=_make_tool_response(
+                    history_entry=f"[2026-01-01] Chat {i} summary.",
+                    memory_update=updates[i],
+                )
+            )
+            results = []
+            for _ in range(20):
+                session = _make_session(message_count=60)
+                results.append(
+                    await MemoryStore(tmp_path).consolidate(session, provider, "test-model", memory_window=50)
+                )
+            return all(results)
+
+        assert await asyncio.gather(_consolidate(0), _consolidate(1)) == [True, True]
+
+        memory_dir = tmp_path / "memory"
+        assert (memory_dir / "MEMORY.md").read_text(encoding="utf-8") in updates
+        history = (memory_dir / "HISTORY.md").read_text(encoding="utf-8")
+        assert history.count("Chat 0 summary.") == 20
+        assert history.count("Chat 1 summary.") == 20
+        assert sorted(p.name for p in memory_dir.iterdir()) == ["HISTORY.md", "MEMORY.md"]
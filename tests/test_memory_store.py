@@ -0,0 +1,152 @@
+"""Tests for MemoryStore file handling (MEMORY.md caching and writes)."""
+
+import os
+import stat
+import threading
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.memory import MemoryStore
+
+
+class TestReadLongTermCache:
+    def test_missing_file_returns_empty(self, tmp_path: Path) -> None:
+        store = MemoryStore(tmp_path)
+        assert store.read_long_term() == ""
+        assert store.get_memory_context() == ""
+
+    def test_unchanged_file_served_from_cache(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("# Memory\nUser likes tea.")
+        assert store.read_long_term() == "# Memory\nUser likes tea."
+
+        reads: list[Path] = []
+        original_read_text = Path.read_text
+
+        def _counting_read_text(self: Path, *args, **kwargs) -> str:
+            reads.append(self)
+            return original_read_text(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "read_text", _counting_read_text)
+        assert store.read_long_term() == "# Memory\nUser likes tea."
+        assert reads == []
+
+    def test_external_edit_invalidates_cache(self, tmp_path: Path) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("old")
+        assert store.read_long_term() == "old"
+
+        store.memory_file.write_text("edited by hand", encoding="utf-8")
+        assert store.read_long_term() == "edited by hand"
+
+    def test_same_size_rewrite_by_other_store_invalidates_cache(self, tmp_path: Path) -> None:
+        reader = MemoryStore(tmp_path)
+        writer = MemoryStore(tmp_path)
+        writer.write_long_term("likes tea")
+        assert reader.read_long_term() == "likes tea"
+
+        # Same size and mtime, but the atomic rename gives the file a new inode.
+        st = reader.memory_file.stat()
+        writer.write_long_term("likes cat")
+        os.utime(reader.memory_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert reader.read_long_term() == "likes cat"
+
+    def test_write_invalidates_cache(self, tmp_path: Path) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("first")
+        assert store.read_long_term() == "first"
+        store.write_long_term("second")
+        assert store.read_long_term() == "second"
+
+    def test_deleted_file_returns_empty(self, tmp_path: Path) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("something")
+        assert store.read_long_term() == "something"
+        store.memory_file.unlink()
+        assert store.read_long_term() == ""
+
+
+class TestWriteLongTerm:
+    def test_write_replaces_content_without_leftover_temp(self, tmp_path: Path) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("a much longer first version of memory")
+        store.write_long_term("short")
+
+        assert store.memory_file.read_text(encoding="utf-8") == "short"
+        assert [p.name for p in store.memory_dir.iterdir()] == ["MEMORY.md"]
+
+    def test_concurrent_writers_leave_one_complete_version(self, tmp_path: Path) -> None:
+        contents = ["a" * 4096, "b" * 8192]
+        stores = [MemoryStore(tmp_path), MemoryStore(tmp_path)]
+        errors: list[Exception] = []
+
+        def _write(store: MemoryStore, content: str) -> None:
+            try:
+                for _ in range(200):
+                    store.write_long_term(content)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_write, args=args) for args in zip(stores, contents)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert stores[0].memory_file.read_text(encoding="utf-8") in contents
+        assert [p.name for p in stores[0].memory_dir.iterdir()] == ["MEMORY.md"]
+
+    def test_failed_write_keeps_old_content_and_leaves_no_temp(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("old")
+
+        def _fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", _fail)
+        with pytest.raises(OSError):
+            store.write_long_term("new")
+
+        assert store.memory_file.read_text(encoding="utf-8") == "old"
+        assert [p.name for p in store.memory_dir.iterdir()] == ["MEMORY.md"]
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+    def test_rewrite_keeps_file_permissions(self, tmp_path: Path) -> None:
+        store = MemoryStore(tmp_path)
+        store.write_long_term("first")
+        store.memory_file.chmod(0o644)
+
+        store.write_long_term("second")
+
+        assert stat.S_IMODE(store.memory_file.stat().st_mode) == 0o644
+        assert store.memory_file.read_text(encoding="utf-8") == "second"
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+    def test_new_file_gets_default_permissions(self, tmp_path: Path) -> None:
+        umask = os.umask(0)
+        os.umask(umask)
+        store = MemoryStore(tmp_path)
+
+        store.write_long_term("first")
+
+        assert stat.S_IMODE(store.memory_file.stat().st_mode) == 0o666 & ~umask
+
+    @pytest.mark.skipif(os.name == "nt", reason="symlinks need privileges on Windows")
+    def test_symlinked_memory_file_is_written_through(self, tmp_path: Path) -> None:
+        target = tmp_path / "shared" / "MEMORY.md"
+        target.parent.mkdir()
+        target.write_text("old", encoding="utf-8")
+        store = MemoryStore(tmp_path / "workspace")
+        store.memory_file.symlink_to(target)
+
+        store.write_long_term("new")
+
+        assert store.memory_file.is_symlink()
+        assert target.read_text(encoding="utf-8") == "new"
+        assert sorted(p.name for p in target.parent.iterdir()) == ["MEMORY.md"]